@@ -1,24 +1,147 @@
+from array import array
+
+_INVERT_BITS = bytes.maketrans(b'\x00\x01', b'\x01\x00')
+# 4-neighbour offsets (up, down, right, left); shared by every grid BFS so
+# the visit order (and hence which path/cell is found first) stays the same
+_NEIGHBORS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+
 class Environment:
     def __init__(self, width=7, height=7):
         self.width = max(5, width)
         self.height = max(5, height)
         self.obstacles = set()
+        # bumped on every obstacle change so cached renders can detect staleness
+        self.revision = 0
+        self._all_cells = None
+        self._all_cells_dims = None
+        self._locations = None
+        self._locations_key = None
+        # row-major occupancy bitmap (1 = obstacle) mirroring `obstacles`
+        self._occ = bytearray(self.width * self.height)
+        self._free_mask = None
+        self._free_mask_key = None
+        self._components = None
+        self._components_key = None
 
     def is_obstacle(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self._occ[y * self.width + x] == 1
         return (x, y) in self.obstacles
     
     
     def is_valid_position(self, x, y):
         in_bounds = 0 <= x <self.width and 0 <= y <self.height
-        return in_bounds and not self.is_obstacle(x, y)
+        return in_bounds and not self._occ[y * self.width + x]
     
     def add_obstacle(self, x, y):
         self.obstacles.add((x, y))
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self._occ[y * self.width + x] = 1
+        self.revision += 1
+
+    def add_obstacles(self, coords):
+        # bulk variant of add_obstacle: one set update and a single revision bump
+        coords = list(coords)
+        self.obstacles.update(coords)
+        w, h = self.width, self.height
+        occ = self._occ
+        for x, y in coords:
+            if 0 <= x < w and 0 <= y < h:
+                occ[y * w + x] = 1
+        self.revision += 1
+
+    def remove_obstacle(self, x, y):
+        self.obstacles.discard((x, y))
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self._occ[y * self.width + x] = 0
+        self.revision += 1
+
+    def set_obstacles(self, cells):
+        self.obstacles = set(cells)
+        self._rebuild_occupancy()
+        self.revision += 1
+
+    def _rebuild_occupancy(self):
+        occ = bytearray(self.width * self.height)
+        for x, y in self.obstacles:
+            if 0 <= x < self.width and 0 <= y < self.height:
+                occ[y * self.width + x] = 1
+        self._occ = occ
+
+    def occupancy(self):
+        """Read-only row-major view of the obstacle bitmap (index y*width+x)."""
+        return memoryview(self._occ).toreadonly()
+
+    def free_mask(self):
+        """Row-major bytes with 1 for free cells and 0 for obstacles (index y*width+x).
+
+        Cached per obstacle revision so BFS callers can reuse it across calls.
+        """
+        key = (self.revision, self.width, self.height)
+        if self._free_mask_key != key:
+            self._free_mask = bytes(self._occ).translate(_INVERT_BITS)
+            self._free_mask_key = key
+        return self._free_mask
+
+    def components(self):
+        """Label the 4-connected components of free cells.
+
+        Returns a dict mapping each free (x, y) to a component id; two cells are
+        mutually reachable iff they map to the same id. Obstacle cells are absent.
+        Cached per obstacle revision, so callers must not mutate it.
+        """
+        key = (self.revision, self.width, self.height)
+        if self._components_key != key:
+            self._components = self._label_components()
+            self._components_key = key
+        return self._components
+
+    def _label_components(self):
+        free = self.free_mask()
+        W, H = self.width, self.height
+        labels = [-1] * (W*H)
+        comp = {}
+        next_label = 0
+        # every cell is enqueued once overall, so one buffer serves all components
+        buf = array('i', bytes(4*W*H))
+        tail = 0
+        for start_idx in range(W*H):
+            if not free[start_idx] or labels[start_idx] != -1:
+                continue
+            labels[start_idx] = next_label
+            head = tail
+            buf[tail] = start_idx
+            tail += 1
+            while head < tail:
+                idx = buf[head]
+                head += 1
+                y, x = divmod(idx, W)
+                comp[(x, y)] = next_label
+                for dx, dy in _NEIGHBORS:
+                    nx, ny = x+dx, y+dy
+                    if 0 <= nx < W and 0 <= ny < H:
+                        nidx = ny*W + nx
+                        if free[nidx] and labels[nidx] == -1:
+                            labels[nidx] = next_label
+                            buf[tail] = nidx
+                            tail += 1
+            next_label += 1
+        return comp
+
+    def all_cells(self):
+        # width/height may be reassigned (e.g. on Reset), so rebuild on change
+        dims = (self.width, self.height)
+        if self._all_cells_dims != dims:
+            self._all_cells = frozenset((x, y) for x in range(self.width) for y in range(self.height))
+            self._all_cells_dims = dims
+        return self._all_cells
 
     def get_locations(self):
-        locations = []
-        for x in range(self.width):
-            for y in range(self.height):
-                if not self.is_obstacle(x, y):
-                    locations.append((x, y))
-        return locations
\ No newline at end of file
+        # memoized per obstacle revision; sorted keeps the x-major order callers
+        # (and generated PDDL) rely on. A copy is returned so callers may mutate it.
+        key = (self.revision, self.width, self.height)
+        if self._locations_key != key:
+            self._locations = sorted(self.all_cells() - self.obstacles)
+            self._locations_key = key
+        return list(self._locations)
\ No newline at end of file
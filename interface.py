@@ -1,11 +1,14 @@
 # interface.py - lightweight pygame GUI for the warehouse simulator
+import time
 import pygame
 from environment import Environment
 
 
 class GUI:
     def __init__(self, environment: Environment, robots, packages):
-        pygame.init()
+        # only the subsystems the GUI uses; skips mixer/joystick hardware probing
+        pygame.display.init()
+        pygame.font.init()
         self.environment = environment
         self.robots = robots
         self.packages = packages
@@ -31,6 +34,34 @@ class GUI:
         self.GRAY = (160, 160, 160)
         self.LIGHT_GRAY = (230, 230, 230)
 
+        # Fonts are created once; building them per frame re-parses the font file
+        self._font22 = pygame.font.Font(None, 22)
+        self._font24 = pygame.font.Font(None, 24)
+        self._font28 = pygame.font.Font(None, 28)
+
+        # Button labels never change, so render them once
+        self._labels = ["Extract State", "Plan", "Execute Plan", "Reset", "Toggle Mode"]
+        self._label_surfs = {lbl: self._font28.render(lbl, True, self.WHITE) for lbl in self._labels}
+        self._mode_surf = None
+        self._mode_surf_random = None
+
+        # Sprites drawn once and blitted in a single batch each frame
+        self._dest_sprite = self._make_circle_sprite(self.RED, 8, 2)
+        self._pkg_sprite = self._make_circle_sprite(self.ORANGE, 12)
+        self._robot_sprite = self._make_circle_sprite(self.BLUE, 16)
+        self._digit_surfs = {}
+
+        # Pixel-center lookup tables for grid cells (y axis flipped)
+        self._cx = []
+        self._cy = []
+        self._center_dims = None
+        self._rebuild_center_tables()
+
+        # Static grid background, re-rendered only when obstacles change
+        self._grid_surface = None
+        self._grid_revision = None
+        self._rebuild_grid_surface()
+
         # Buttons and flags
         self.buttons = {}
         self.info_message = "Ready to plan."
@@ -40,54 +71,97 @@ class GUI:
         self.last_execution_success = False
         self.seed = None
 
+        # Redraw only when something changed; idle frames skip draw() entirely
+        self._dirty = True
+
+        # Plan being animated: a PlanExecutor step generator advanced from run()
+        self._active_plan = None
+        self._step_delay = 0.4
+        self._next_step_time = 0.0
+
         # Confirmation modal for mode switching
         self.pending_mode_confirm = False
         self.pending_mode_target = None
+        # modal overlay and panels are built lazily and reused while it is open
+        self._modal_overlay = None
+        self._modal_panels = {}
+
+    def _rebuild_center_tables(self):
+        cs = self.cell_size
+        w, h = self.environment.width, self.environment.height
+        self._cx = [x * cs + cs // 2 for x in range(w)]
+        self._cy = [(h - 1 - y) * cs + cs // 2 for y in range(h)]
+        self._center_dims = (w, h, cs)
 
     def _grid_to_pixel_center(self, x, y):
-        cx = x * self.cell_size + self.cell_size // 2
-        cy = (self.environment.height - 1 - y) * self.cell_size + self.cell_size // 2
-        return cx, cy
+        return self._cx[x], self._cy[y]
 
-    def draw(self):
-        self.screen.fill(self.WHITE)
+    def _make_circle_sprite(self, color, radius, width=0):
+        size = radius * 2 + 2
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, color, (size // 2, size // 2), radius, width)
+        return sprite
 
-        # draw grid cells
+    def _digit_surf(self, n):
+        surf = self._digit_surfs.get(n)
+        if surf is None:
+            surf = self._font24.render(str(n), True, self.WHITE)
+            self._digit_surfs[n] = surf
+        return surf
+
+    def _rebuild_grid_surface(self):
+        surface = pygame.Surface((self.grid_width, self.grid_height))
         for x in range(self.environment.width):
             for y in range(self.environment.height):
                 rx = x * self.cell_size
                 ry = (self.environment.height - 1 - y) * self.cell_size
                 rect = pygame.Rect(rx, ry, self.cell_size, self.cell_size)
                 color = self.GRAY if self.environment.is_obstacle(x, y) else self.LIGHT_GRAY
-                pygame.draw.rect(self.screen, color, rect)
-                pygame.draw.rect(self.screen, self.BLACK, rect, 1)
+                pygame.draw.rect(surface, color, rect)
+                pygame.draw.rect(surface, self.BLACK, rect, 1)
+        self._grid_surface = surface
+        self._grid_revision = self.environment.revision
+
+    def draw(self):
+        self.screen.fill(self.WHITE)
+
+        # draw grid cells (cached; rebuilt after obstacle edits)
+        if self._grid_revision != self.environment.revision:
+            self._rebuild_grid_surface()
+        self.screen.blit(self._grid_surface, (0, 0))
+
+        if self._center_dims != (self.environment.width, self.environment.height, self.cell_size):
+            self._rebuild_center_tables()
+
+        blit_list = []
 
         # package destinations
         for pkg in self.packages:
-            if getattr(pkg, 'state', None) == 'Delivered':
+            if pkg.state == 'Delivered':
                 continue
             dx, dy = pkg.destination
             cx, cy = self._grid_to_pixel_center(dx, dy)
-            pygame.draw.circle(self.screen, self.RED, (cx, cy), 8, 2)
+            blit_list.append((self._dest_sprite, self._dest_sprite.get_rect(center=(cx, cy))))
 
         # packages
         for pkg in self.packages:
-            if getattr(pkg, 'state', None) == 'Delivered':
+            if pkg.state == 'Delivered':
                 continue
             if not pkg.is_carried:
                 x, y = pkg.position
                 cx, cy = self._grid_to_pixel_center(x, y)
-                pygame.draw.circle(self.screen, self.ORANGE, (cx, cy), 12)
+                blit_list.append((self._pkg_sprite, self._pkg_sprite.get_rect(center=(cx, cy))))
 
         # robots
-        font = pygame.font.Font(None, 24)
+        font = self._font24
         for r in self.robots:
             x, y = r.position
             cx, cy = self._grid_to_pixel_center(x, y)
-            pygame.draw.circle(self.screen, self.BLUE, (cx, cy), 16)
-            txt = font.render(str(len(r.carrying)), True, self.WHITE)
-            tr = txt.get_rect(center=(cx, cy))
-            self.screen.blit(txt, tr)
+            blit_list.append((self._robot_sprite, self._robot_sprite.get_rect(center=(cx, cy))))
+            txt = self._digit_surf(len(r.carrying))
+            blit_list.append((txt, txt.get_rect(center=(cx, cy))))
+
+        self.screen.blits(blit_list, doreturn=False)
 
         # controls
         self._draw_controls()
@@ -96,28 +170,17 @@ class GUI:
 
         # If a modal is active, draw it on top (and populate Confirm buttons)
         if self.pending_mode_confirm:
-            overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 150))
-            self.screen.blit(overlay, (0, 0))
-
-            modal_w, modal_h = 380, 150
-            mx = (self.width - modal_w) // 2
-            my = (self.height - modal_h) // 2
-            modal = pygame.Rect(mx, my, modal_w, modal_h)
-            pygame.draw.rect(self.screen, self.WHITE, modal)
-            pygame.draw.rect(self.screen, self.BLACK, modal, 2)
-
-            title = font.render(f"Confirm switch to {self.pending_mode_target} mode?", True, self.BLACK)
-            self.screen.blit(title, (mx + 20, my + 20))
-
-            yes = pygame.Rect(mx + 40, my + 80, 120, 40)
-            no = pygame.Rect(mx + 220, my + 80, 120, 40)
-            pygame.draw.rect(self.screen, (0, 140, 0), yes)
-            pygame.draw.rect(self.screen, (180, 30, 30), no)
-            ytxt = font.render("Yes", True, self.WHITE)
-            ntxt = font.render("No", True, self.WHITE)
-            self.screen.blit(ytxt, (yes.x + 46, yes.y + 8))
-            self.screen.blit(ntxt, (no.x + 50, no.y + 8))
+            if self._modal_overlay is None or self._modal_overlay.get_size() != (self.width, self.height):
+                self._modal_overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+                self._modal_overlay.fill((0, 0, 0, 150))
+            self.screen.blit(self._modal_overlay, (0, 0))
+
+            panel = self._modal_panels.get(self.pending_mode_target)
+            if panel is None:
+                panel = self._build_modal_panel(font, self.pending_mode_target)
+                self._modal_panels[self.pending_mode_target] = panel
+            surface, modal, yes, no = panel
+            self.screen.blit(surface, modal.topleft)
 
             # expose to click handler
             self.buttons['ConfirmYes'] = yes
@@ -125,13 +188,39 @@ class GUI:
 
         pygame.display.flip()
 
+    def _build_modal_panel(self, font, target):
+        modal_w, modal_h = 380, 150
+        mx = (self.width - modal_w) // 2
+        my = (self.height - modal_h) // 2
+        modal = pygame.Rect(mx, my, modal_w, modal_h)
+
+        # drawn in panel-local coordinates; the rects returned are screen-space
+        surface = pygame.Surface((modal_w, modal_h))
+        local = surface.get_rect()
+        pygame.draw.rect(surface, self.WHITE, local)
+        pygame.draw.rect(surface, self.BLACK, local, 2)
+
+        title = font.render(f"Confirm switch to {target} mode?", True, self.BLACK)
+        surface.blit(title, (20, 20))
+
+        yes_local = pygame.Rect(40, 80, 120, 40)
+        no_local = pygame.Rect(220, 80, 120, 40)
+        pygame.draw.rect(surface, (0, 140, 0), yes_local)
+        pygame.draw.rect(surface, (180, 30, 30), no_local)
+        ytxt = font.render("Yes", True, self.WHITE)
+        ntxt = font.render("No", True, self.WHITE)
+        surface.blit(ytxt, (yes_local.x + 46, yes_local.y + 8))
+        surface.blit(ntxt, (no_local.x + 50, no_local.y + 8))
+
+        yes = yes_local.move(mx, my)
+        no = no_local.move(mx, my)
+        return surface, modal, yes, no
+
     def _draw_controls(self):
-        font = pygame.font.Font(None, 28)
         panel_y = self.grid_height + 10
-        labels = ["Extract State", "Plan", "Execute Plan", "Reset", "Toggle Mode"]
         x = 10
-        for label in labels:
-            surf = font.render(label, True, self.WHITE)
+        for label in self._labels:
+            surf = self._label_surfs[label]
             rect = pygame.Rect(x, panel_y, surf.get_width() + 20, surf.get_height() + 10)
 
             # special color for Toggle Mode to indicate state
@@ -145,12 +234,15 @@ class GUI:
             x += rect.width + 14
 
         # status text (show only current mode; dynamic-obstacles label removed)
-        status = 'Random' if self.randomize_enabled else 'Manual'
-        mode_txt = font.render(f"Mode: {status}", True, self.BLACK)
-        self.screen.blit(mode_txt, (x + 10, panel_y + 5))
+        # re-rendered only when the mode flips
+        if self._mode_surf is None or self._mode_surf_random != self.randomize_enabled:
+            status = 'Random' if self.randomize_enabled else 'Manual'
+            self._mode_surf = self._font28.render(f"Mode: {status}", True, self.BLACK)
+            self._mode_surf_random = self.randomize_enabled
+        self.screen.blit(self._mode_surf, (x + 10, panel_y + 5))
 
     def _draw_info(self):
-        font = pygame.font.Font(None, 22)
+        font = self._font22
         info_y = self.grid_height + 60
         try:
             msg = self.info_message
@@ -166,16 +258,57 @@ class GUI:
             info_y += 20
         if len(self.packages) > 0:
             p = self.packages[0]
-            st = getattr(p, 'state', 'Idle')
+            st = p.state
             self.screen.blit(font.render(f"Package {p.id}: {p.position} -> {p.destination} state:{st}", True, self.BLACK), (10, info_y))
 
     def update_info(self, message: str):
         self.info_message = message
+        self._dirty = True
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    def start_plan(self, steps, delay=0.4):
+        """Animate a plan by advancing `steps` (see PlanExecutor.iter_plan*) every `delay` seconds."""
+        self._active_plan = steps
+        self._step_delay = delay
+        self._next_step_time = 0.0
+        self._dirty = True
+
+    def cancel_plan(self):
+        if self._active_plan is not None:
+            self._active_plan.close()
+            self._active_plan = None
+            self._dirty = True
+
+    def plan_running(self):
+        return self._active_plan is not None
+
+    def _advance_plan(self):
+        now = time.monotonic()
+        if now < self._next_step_time:
+            return
+        try:
+            next(self._active_plan)
+            self._next_step_time = now + self._step_delay
+        except StopIteration:
+            self._active_plan = None
+        except Exception as e:
+            self._active_plan = None
+            self.update_info(f"Execution Error: {e}")
+        self._dirty = True
 
     def run(self, click_handler):
         running = True
         while running:
-            for event in pygame.event.get():
+            # When nothing is changing, block on the event queue (with a timeout)
+            # instead of polling at 30 FPS.
+            idle = not self._dirty and not self.pending_mode_confirm and self._active_plan is None
+            if idle:
+                events = [pygame.event.wait(200)]
+            else:
+                events = pygame.event.get()
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -183,8 +316,16 @@ class GUI:
                     # reset the buttons map so stale rects aren't reused
                     # click handler may rely on buttons populated in the last draw
                     click_handler(pos)
-            self.draw()
-            self.clock.tick(30)
+                    self._dirty = True
+                elif event.type == pygame.VIDEOEXPOSE:
+                    self._dirty = True
+            if self._active_plan is not None:
+                self._advance_plan()
+            if self._dirty:
+                self._dirty = False
+                self.draw()
+            if not idle:
+                self.clock.tick(30)
 
         pygame.quit()
         return True
\ No newline at end of file
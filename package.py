@@ -2,6 +2,8 @@
 class Package: # FIX: Uppercase 'P'
     def __init__(self, pkg_id, position, destination):
         self.id = pkg_id
+        # PDDL object name; ids are fixed, so lowercase once here
+        self.id_lower = str(pkg_id).lower()
         self.position = position  # (x, y)
         self.destination = destination  # (x, y)
         self.is_carried = False
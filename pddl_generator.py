@@ -1,60 +1,74 @@
 # pddl_generator.py
+"""PDDL problem generation for the warehouse domain.
+
+Connectivity contract: the domain's `move` action tests the directed fact
+`(connected ?from ?to)`, so every adjacency must be emitted in both
+directions. Generators visit each undirected edge once and write the two
+directed facts next to each other.
+"""
 import math
+import os
+import re
 
 def get_zone_name(x, y):
     # FIX 1: Use underscore, not hyphen (zone_x_y)
     return f"zone_{x}_{y}"
 
 
+# `(connected zone_X_Y zone_X_Y)` facts, commented or not; groups are
+# (zone_a, ax, ay, zone_b, bx, by)
+_CONN_RE = re.compile(r'\(connected\s+(zone_(\d+)_(\d+))\s+(zone_(\d+)_(\d+))\)')
+
+# Unfiltered facts per (path, mtime). This is the only cache of the domain
+# parse: every caller (extraction and the planner problem writer) re-filters
+# these against the current obstacles instead of re-reading the file.
+_RAW_CONN_CACHE = {}
+_RAW_CONN_CACHE_SIZE = 8
+
+
+def _raw_connectivity(domain_path):
+    """Return (zone_a, ax, ay, zone_b, bx, by) for every fact in the file, or None if it is missing."""
+    try:
+        key = (domain_path, os.path.getmtime(domain_path))
+    except OSError:
+        return None
+    raw = _RAW_CONN_CACHE.get(key)
+    if raw is None:
+        try:
+            with open(domain_path, 'r') as df:
+                data = df.read()
+        except FileNotFoundError:
+            return None
+        raw = tuple((a, int(ax), int(ay), b, int(bx), int(by))
+                    for a, ax, ay, b, bx, by in _CONN_RE.findall(data))
+        if len(_RAW_CONN_CACHE) >= _RAW_CONN_CACHE_SIZE:
+            _RAW_CONN_CACHE.clear()
+        _RAW_CONN_CACHE[key] = raw
+    return raw
+
+
 def parse_connectivity_from_domain(domain_path='domain.pddl', env=None):
     """Parse commented connectivity facts from domain.pddl and return a list
     of (zone_a, zone_b) tuples filtered by the provided environment.
 
-    The function looks for lines that contain a commented connectivity fact,
-    e.g. ';; (connected zone_0_0 zone_0_1)'. If none are found, returns an
-    empty list.
+    The function looks for connectivity facts anywhere in the file, commented
+    or not, e.g. ';; (connected zone_0_0 zone_0_1)'. If none are found,
+    returns an empty list.
     """
-    conns = []
-    try:
-        with open(domain_path, 'r') as df:
-            for line in df:
-                s = line.strip()
-                # accept both commented copies and raw facts
-                if s.startswith(';;'):
-                    s2 = s[2:].strip()
-                else:
-                    s2 = s
-                if s2.startswith('(connected '):
-                    # naive parse: split tokens inside the parentheses
-                    try:
-                        tokens = s2.strip('()').split()
-                        # tokens[0] == 'connected'
-                        if len(tokens) >= 3:
-                            a = tokens[1]
-                            b = tokens[2]
-                            # if env is provided, ensure both zones map to valid positions
-                            if env is not None:
-                                def zone_to_coords(z):
-                                    parts = z.split('_')
-                                    try:
-                                        x = int(parts[1])
-                                        y = int(parts[2])
-                                        return x, y
-                                    except Exception:
-                                        return None
-                                ca = zone_to_coords(a)
-                                cb = zone_to_coords(b)
-                                if ca is None or cb is None:
-                                    continue
-                                if not env.is_valid_position(*ca) or not env.is_valid_position(*cb):
-                                    # skip connections that involve obstacle/invalid cells
-                                    continue
-                            conns.append((a, b))
-                    except Exception:
-                        continue
-    except FileNotFoundError:
+    if not os.path.isfile(domain_path):
+        return []
+    raw = _raw_connectivity(domain_path)
+    if raw is None:
         return []
-    return conns
+
+    if env is None:
+        return [(a, b) for a, _, _, b, _, _ in raw]
+
+    # ensure both zones map to valid positions; skip connections that
+    # involve obstacle/invalid cells
+    valid = set(env.get_locations())
+    return [(a, b) for a, ax, ay, b, bx, by in raw
+            if (ax, ay) in valid and (bx, by) in valid]
 
 def extract_state_to_pddl(environment, robots, packages, output_file = "problem.pddl", include_connectivity: bool = False):
     """Write the current environment, robots and packages to a PDDL problem file.
@@ -68,8 +82,8 @@ def extract_state_to_pddl(environment, robots, packages, output_file = "problem.
     occupied).
 
     Parameters
-    - environment: Environment instance exposing `get_locations()` and
-      `is_valid_position(x,y)`.
+    - environment: Environment instance exposing `all_cells()` and
+      `get_locations()`.
     - robots: list of Robot objects with `.id`, `.position`, `.can_carry_more()`.
     - packages: list of Package objects with `.id`, `.position`, `.is_carried`,
       `.carrier_id`, `.destination`, and optional `.assigned_robot_id`.
@@ -77,85 +91,95 @@ def extract_state_to_pddl(environment, robots, packages, output_file = "problem.
     - include_connectivity: if True, include (connected ...) facts; otherwise
       omit them (used for repository template extraction).
     """
-    with open(output_file , 'w') as f:
-        f.write("(define (problem warehouse-delivery)\n")
-        f.write(" (:domain warehouse)\n\n")
-
-        # 1. Objects
-        f.write(" (:objects\n")
-        # Write objects using lowercase IDs to match parser/plan executor normalization
-        robot_objects = " ".join(f"{r.id.lower()}" for r in robots)
-        f.write(f"  {robot_objects} - robot\n")
-
-        package_objects = " ".join(f"{p.id.lower()}" for p in packages)
-        f.write(f"  {package_objects} - package\n")
-
-        zone_objects = [get_zone_name(x, y) for x, y in environment.get_locations()] 
-        f.write(f"  {' '.join(zone_objects)} - location\n")
-
-        f.write(" )\n\n")
-
-        # 2. Initial State (:init)
-        f.write(" (:init\n")
-
-        # Robot positions and capacity
-        for robot in robots:
-            x, y = robot.position
-            zone = get_zone_name(x, y)
-            # Write robot facts using lowercase IDs
-            f.write(f"  (at-robot {robot.id.lower()} {zone})\n") 
-
-            if robot.can_carry_more():
-                f.write(f"  (robot-free {robot.id.lower()})\n")
-
-            # Mark the location as occupied by a robot so planners can
-            # prevent collision (no two robots should occupy the same cell).
-            f.write(f"  (occupied {zone})\n")
-
-        # Package positions (on ground or in robot)
-        for pkg in packages:
-            if pkg.is_carried:
-                # Domain defines (carrying ?r - robot ?p - package)
-                # Write robot first, then package, and use lowercase IDs
-                f.write(f"  (carrying {pkg.carrier_id.lower()} {pkg.id.lower()})\n")
-            else:
-                x, y = pkg.position
-                zone = get_zone_name(x, y)
-                f.write(f"  (at-package {pkg.id.lower()} {zone})\n")
-
-        # Package assignments (optional)
-        for pkg in packages:
-            assigned = getattr(pkg, 'assigned_robot_id', None)
-            if assigned:
-                f.write(f"  (assigned {pkg.id.lower()} {assigned.lower()})\n")
-        
-        # Optionally include connections between zones. By default (when called
-        # from the GUI's "Extract State" action) we do NOT include connectivity
-        # facts in the repository template `problem.pddl`. The planner uses
-        # `write_planner_problem` which will inject connectivity before planning.
-        if include_connectivity:
-            # Prefer the connectivity documented in domain.pddl (as comments)
-            # if available, otherwise compute from the environment.
-            conns = parse_connectivity_from_domain('domain.pddl', env=environment)
-            if conns:
-                for a, b in conns:
-                    f.write(f"  (connected {a} {b})\n")
-            else:
-                for x, y in environment.get_locations():
-                    current_zone = get_zone_name(x, y)
-                    for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                        nx , ny = x + dx, y + dy
-                        if environment.is_valid_position(nx, ny):
-                            neighbor_zone = get_zone_name(nx, ny)
-                            f.write(f"  (connected {current_zone} {neighbor_zone})\n")
-
-        f.write(" )\n\n")
-
-        # 3. Goal (:goal)
-        f.write(" (:goal (and\n")
-        for pkg in packages:
-            dest_x, dest_y = pkg.destination
-            dest_zone = get_zone_name(dest_x, dest_y)
-            f.write(f"  (at-package {pkg.id.lower()} {dest_zone})\n")
-        f.write(" ))\n")
-        f.write(")\n")
\ No newline at end of file
+    # Zone names are looked up per cell many times below; format each once
+    zone_of = {(x, y): get_zone_name(x, y) for (x, y) in environment.all_cells()}
+    locations = environment.get_locations()
+    valid = set(locations)
+
+    # Build the document in memory and write it with a single call
+    parts = []
+    append = parts.append
+    append("(define (problem warehouse-delivery)\n")
+    append(" (:domain warehouse)\n\n")
+
+    # 1. Objects
+    append(" (:objects\n")
+    # Write objects using lowercase IDs to match parser/plan executor normalization
+    robot_objects = " ".join(r.id_lower for r in robots)
+    append(f"  {robot_objects} - robot\n")
+
+    package_objects = " ".join(p.id_lower for p in packages)
+    append(f"  {package_objects} - package\n")
+
+    zone_objects = [zone_of[loc] for loc in locations]
+    append(f"  {' '.join(zone_objects)} - location\n")
+
+    append(" )\n\n")
+
+    # 2. Initial State (:init)
+    append(" (:init\n")
+
+    # Robot positions and capacity
+    for robot in robots:
+        zone = zone_of[robot.position]
+        # Write robot facts using lowercase IDs
+        append(f"  (at-robot {robot.id_lower} {zone})\n") 
+
+        if robot.can_carry_more():
+            append(f"  (robot-free {robot.id_lower})\n")
+
+        # Mark the location as occupied by a robot so planners can
+        # prevent collision (no two robots should occupy the same cell).
+        append(f"  (occupied {zone})\n")
+
+    # Package positions (on ground or in robot) and optional assignments
+    for pkg in packages:
+        if pkg.is_carried:
+            # Domain defines (carrying ?r - robot ?p - package)
+            # Write robot first, then package, and use lowercase IDs
+            append(f"  (carrying {pkg.carrier_id.lower()} {pkg.id_lower})\n")
+        else:
+            append(f"  (at-package {pkg.id_lower} {zone_of[pkg.position]})\n")
+
+        assigned = getattr(pkg, 'assigned_robot_id', None)
+        if assigned:
+            append(f"  (assigned {pkg.id_lower} {assigned.lower()})\n")
+    
+    # Optionally include connections between zones. By default (when called
+    # from the GUI's "Extract State" action) we do NOT include connectivity
+    # facts in the repository template `problem.pddl`. The planner uses
+    # `write_planner_problem` which will inject connectivity before planning.
+    if include_connectivity:
+        # Prefer the connectivity documented in domain.pddl (as comments)
+        # if available, otherwise compute from the environment.
+        conns = parse_connectivity_from_domain('domain.pddl', env=environment)
+        if conns:
+            # drop repeated facts; dict keeps the documented order
+            parts.extend(f"  (connected {a} {b})\n" for a, b in dict.fromkeys(conns))
+        else:
+            # each undirected edge once (up/right neighbour), both directions
+            parts.extend([
+                fact
+                for x, y in locations
+                for nx, ny in ((x, y + 1), (x + 1, y))
+                if (nx, ny) in valid
+                for fact in (
+                    f"  (connected {zone_of[(x, y)]} {zone_of[(nx, ny)]})\n",
+                    f"  (connected {zone_of[(nx, ny)]} {zone_of[(x, y)]})\n",
+                )
+            ])
+
+    append(" )\n\n")
+
+    # 3. Goal (:goal)
+    append(" (:goal (and\n")
+    for pkg in packages:
+        dest_zone = zone_of[pkg.destination]
+        append(f"  (at-package {pkg.id_lower} {dest_zone})\n")
+    append(" ))\n")
+    append(")\n")
+
+    # PDDL is plain ASCII: encode the whole document once and write bytes,
+    # bypassing the text layer's per-write codec and newline translation
+    with open(output_file, 'wb', buffering=1 << 17) as f:
+        f.write(''.join(parts).encode('utf-8'))
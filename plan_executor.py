@@ -2,6 +2,8 @@
 import time 
 import re 
 import os # For future debugging or file checks
+from collections import deque
+from environment import _NEIGHBORS
 
 def parse_plan(plan_file):
     """
@@ -44,8 +46,8 @@ class PlanExecutor:
     def __init__(self, environment, robots, packages, gui_instance=None):
         self.environment = environment 
         # Normalize robot and package ids to lowercase for case-insensitive matching
-        self.robots = {r.id.lower(): r for r in robots}
-        self.packages = {p.id.lower(): p for p in packages} 
+        self.robots = {r.id_lower: r for r in robots}
+        self.packages = {p.id_lower: p for p in packages} 
         self.gui = gui_instance
         # If True, executor will compute shortest paths per robot instead of following planner moves
         self.shortest_path_mode = True
@@ -119,8 +121,30 @@ class PlanExecutor:
             print(f"Error executing action {action_name} with params {params}: {e}")
             return False
         
+    def _run_steps(self, steps, delay):
+        """Drive a step generator to completion, redrawing and pausing between steps."""
+        while True:
+            try:
+                next(steps)
+            except StopIteration as stop:
+                return stop.value
+            # Redraw and pause for animation
+            if self.gui:
+                self.gui.mark_dirty()
+                self.gui.draw()
+                time.sleep(delay)
+
     def execute_plan(self, plan, delay=0.5): 
         """Executes the entire parsed plan with visualization."""
+        return self._run_steps(self.iter_plan(plan), delay)
+
+    def iter_plan(self, plan):
+        """Generator form of `execute_plan`: yields after each executed action.
+
+        The generator's return value (StopIteration.value) is True on success
+        and False on failure. The GUI advances it from its frame loop so the
+        window keeps processing events while a plan runs.
+        """
         for i, (action, params) in enumerate(plan):
             step_info = f"Step {i+1}/{len(plan)}: ({action} {' '.join(params)})"
             print(step_info)
@@ -140,10 +164,7 @@ class PlanExecutor:
                     self.gui.update_info(f"Failure at step {i+1}. Check terminal.")
                 return False 
             
-            # Redraw and pause for animation
-            if self.gui:
-                self.gui.draw()
-                time.sleep(delay)
+            yield
 
         print("Plan executed successfully.")
         if self.gui:
@@ -156,7 +177,11 @@ class PlanExecutor:
         return True
 
     def execute_plan_parallel(self, plan, delay=0.5):
-        """Execute plan attempting to run actions for different robots in parallel.
+        """Execute plan attempting to run actions for different robots in parallel."""
+        return self._run_steps(self.iter_plan_parallel(plan), delay)
+
+    def iter_plan_parallel(self, plan):
+        """Generator form of `execute_plan_parallel`: yields once per parallel tick.
 
         Strategy:
         - Build per-robot action queues preserving order from the plan.
@@ -168,16 +193,14 @@ class PlanExecutor:
         # Build per-robot queues. If shortest_path_mode is enabled, create high-level
         # queues using shortest paths (move sequences + pickup/drop) based on current
         # package assignments; otherwise, use the plan as-is (per-robot actions).
-        from collections import deque
         robot_actions = {rid: deque() for rid in self.robots.keys()}
 
         if self.shortest_path_mode:
             # Helper: BFS shortest path on grid avoiding obstacles
-            from collections import deque as _deque
             def shortest_path(start, goal):
                 if start == goal:
                     return []
-                q = _deque()
+                q = deque()
                 q.append(start)
                 prev = {start: None}
                 while q:
@@ -185,7 +208,7 @@ class PlanExecutor:
                     if cur == goal:
                         break
                     x, y = cur
-                    for dx, dy in [(0,1),(0,-1),(1,0),(-1,0)]:
+                    for dx, dy in _NEIGHBORS:
                         nx, ny = x+dx, y+dy
                         if 0 <= nx < self.environment.width and 0 <= ny < self.environment.height and (nx, ny) not in prev and self.environment.is_valid_position(nx, ny):
                             prev[(nx, ny)] = cur
@@ -352,10 +375,8 @@ class PlanExecutor:
             for rid in list(selected.keys()):
                 robot_actions[rid].popleft()
 
-            # redraw once per parallel tick
-            if self.gui:
-                self.gui.draw()
-                time.sleep(delay)
+            # hand control back once per parallel tick (caller redraws)
+            yield
 
         # success
         print("Parallel plan executed successfully.")
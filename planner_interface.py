@@ -2,9 +2,10 @@
 import subprocess
 import os
 import sys
+import tempfile
 from typing import Optional
 
-def call_planner(domain_file, problem_file, output_file="solution.txt"):
+def call_planner(domain_file, problem_file, output_file="solution.txt", verbose=False):
     """
     Calls Fast Downward to solve the PDDL problem using the absolute path.
     Returns True if a plan was found, False otherwise.
@@ -12,6 +13,9 @@ def call_planner(domain_file, problem_file, output_file="solution.txt"):
     Notes:
     - Fast Downward saves the plan in a file named 'sas_plan' by default.
     - Fast Downward does NOT print "Solution found", so we check the plan file instead.
+    - The planner's stdout is spooled to an anonymous temp file rather than
+      held in memory, and only printed when no plan is found. With
+      `verbose=True` it goes straight to the console instead.
     """
     
     # Use the repository's downward/fast-downward.py script if present.
@@ -25,11 +29,13 @@ def call_planner(domain_file, problem_file, output_file="solution.txt"):
     # Fast Downward requires compiled planner builds under downward/builds/release/bin
     build_bin_dir = os.path.join(os.getcwd(), "downward", "builds", "release", "bin")
     if not os.path.isdir(build_bin_dir):
-        print("❌ Fast Downward build not found.")
-        print(f"Expected build directory: {build_bin_dir}")
-        print("To build Fast Downward, run the following in the 'downward' folder:")
-        print("  cd downward && python build.py release")
-        print("Note: building requires a C/C++ toolchain (cmake, make, a compiler).")
+        print("\n".join((
+            "❌ Fast Downward build not found.",
+            f"Expected build directory: {build_bin_dir}",
+            "To build Fast Downward, run the following in the 'downward' folder:",
+            "  cd downward && python build.py release",
+            "Note: building requires a C/C++ toolchain (cmake, make, a compiler).",
+        )))
         return False
 
     python_exec = sys.executable or "python"
@@ -48,35 +54,36 @@ def call_planner(domain_file, problem_file, output_file="solution.txt"):
     ]
     
     try:
-        # Run Fast Downward
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120,  # increase timeout to 120s
-            cwd=os.getcwd(),
-        )
-        
-        # --- FIXED SUCCESS CHECK ---
-        # Fast Downward doesn't always print "Plan found"; check for the output plan file.
-        if os.path.exists("sas_plan"):
-            print("✅ Plan found successfully! (sas_plan created)")
+        with tempfile.TemporaryFile() as log:
+            # Run Fast Downward
+            subprocess.run(
+                cmd,
+                stdout=None if verbose else log,
+                stderr=None if verbose else subprocess.DEVNULL,
+                timeout=120,  # increase timeout to 120s
+                cwd=os.getcwd(),
+            )
 
-            # Rename the plan file to the desired output
+            # --- FIXED SUCCESS CHECK ---
+            # Fast Downward doesn't always print "Plan found"; check for the output plan file.
             if os.path.exists("sas_plan"):
-                try:
-                    os.rename("sas_plan", output_file)
-                except FileExistsError:
-                    # If output_file already exists, remove and rename
-                    os.remove(output_file)
-                    os.rename("sas_plan", output_file)
-            return True
-        else:
-            print("❌ No plan found.")
-            print("--- Planner Output ---")
-            print(result.stdout)
-            print("--- End Output ---")
-            return False
+                print("✅ Plan found successfully! (sas_plan created)")
+
+                # Move the plan file to the desired output (overwrites atomically)
+                os.replace("sas_plan", output_file)
+                return True
+            else:
+                if verbose:
+                    print("❌ No plan found.")
+                else:
+                    log.seek(0)
+                    print("\n".join((
+                        "❌ No plan found.",
+                        "--- Planner Output ---",
+                        log.read().decode(errors="replace"),
+                        "--- End Output ---",
+                    )))
+                return False
 
     except subprocess.TimeoutExpired:
         print("⚠️ Timeout: Planner took too long.")
@@ -87,3 +94,30 @@ def call_planner(domain_file, problem_file, output_file="solution.txt"):
     except Exception as e:
         print(f"❌ Error calling planner: {e}")
         return False
+
+
+def call_planner_from_string(domain_file, problem_text, output_file="solution.txt", verbose=False):
+    """
+    Like `call_planner`, but takes the problem as PDDL text instead of a file.
+
+    Fast Downward's driver only accepts the problem as a path, so the text is
+    written to a short-lived file in /dev/shm (tmpfs) when available, falling
+    back to the system temp directory. The file is removed once the planner
+    has finished.
+    """
+    tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+    try:
+        fd, problem_file = tempfile.mkstemp(prefix="problem_", suffix=".pddl", dir=tmp_dir)
+        with os.fdopen(fd, "w") as f:
+            f.write(problem_text)
+    except OSError as e:
+        print(f"❌ Error writing problem for planner: {e}")
+        return False
+
+    try:
+        return call_planner(domain_file, problem_file, output_file, verbose)
+    finally:
+        try:
+            os.remove(problem_file)
+        except OSError:
+            pass
@@ -1,9 +1,13 @@
 class Robot:
     def __init__(self, robot_id, position, capacity=2):
         self.id = robot_id
+        # PDDL object name; ids are fixed, so lowercase once here
+        self.id_lower = str(robot_id).lower()
         self.position = position  # (x, y)
         self.capacity = capacity
-        self.carrying = []  # List of package IDs
+        self.carrying = set()  # Package objects being carried
+        # free slots, kept in step with `carrying` by pickup/drop
+        self._free = capacity
 
     def move(self, direction, environment):
         x, y = self.position
@@ -20,7 +24,8 @@ class Robot:
     
     def pickup(self, package):
         if self.can_carry_more() and package.position == self.position and not package.is_carried:
-            self.carrying.append(package)
+            self.carrying.add(package)
+            self._free -= 1
             package.is_carried = True
             package.carrier_id = self.id
             package.state = "Transported"
@@ -30,6 +35,7 @@ class Robot:
     def drop(self, package):
         if package in self.carrying:
             self.carrying.remove(package)
+            self._free += 1
             package.is_carried = False
             package.carrier_id = None
             package.position = self.position
@@ -42,5 +48,5 @@ class Robot:
         return False
     
     def can_carry_more(self):
-        return len(self.carrying) < self.capacity
+        return self._free > 0
            
\ No newline at end of file